@@ -35,6 +35,8 @@ the results.
 import logging
 import subprocess
 
+log = logging.getLogger('pyflatpak.Command')
+
 class Command():
     """
     This is a command library that issues commands to flatpak and returns 
@@ -48,10 +50,10 @@ class Command():
     """
 
     def __init__(self, command):
-        self.log = logging.getLogger('pyflatpak.Command')
+        self.log = log
         self.log.debug('Loaded!')
         self.command = command
-        self.log.info('Got command, {}'.format(self.command))
+        self.log.info('Got command, %s', self.command)
     
     def run(self):
         """
@@ -31,14 +31,96 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 Queries information about flatpak remotes
 """
 
-from configparser import ConfigParser
+from functools import lru_cache
 import logging
 import os
 import pathlib
+import re
 from subprocess import CalledProcessError
 
 import pyflatpak.command as command
 
+log = logging.getLogger('pyflatpak.Remotes')
+
+# Values flatpak treats as true for boolean keys like xa.disable
+_TRUE_VALUES = frozenset(('true', 'yes', '1'))
+
+# Section headers for remotes look like: remote "NAME"
+_REMOTE_SECTION_RE = re.compile(r'remote "([^"]+)"')
+
+# Parsed config files, keyed by path. Each entry is (key, config), where key
+# is the file's (st_mtime_ns, st_size, st_ino), so that a file is only
+# re-parsed after flatpak has modified it. Flatpak replaces the config by
+# renaming a new file over it, so the inode changes even when a rewrite lands
+# within the same mtime tick as the cached parse.
+_CONFIG_CACHE = {}
+
+def _parse_flatpak_config(config_file):
+    """
+    Parse the lines of an open flatpak repo CONFIG_FILE.
+
+    Flatpak writes these as GKeyFiles: [section] headers, key=value lines and
+    '#' comments, without the interpolation or continuation lines that
+    ConfigParser has to handle. Unlike ConfigParser, keys keep their case,
+    repeated sections are merged rather than raising an error, and lines
+    before the first section header are ignored.
+
+    Returns:
+        A dict mapping each section name to a dict of its keys and values.
+    """
+    config = {}
+    section = None
+
+    for line in config_file:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('[') and line.endswith(']'):
+            section = config.setdefault(line[1:-1], {})
+        elif section is not None and '=' in line:
+            key, value = line.split('=', 1)
+            section[key.strip()] = value.strip()
+
+    return config
+
+def _load_config(path):
+    """
+    Return the parsed config for PATH, reusing a cached parse if the file
+    hasn't changed since it was last read.
+
+    Raises FileNotFoundError if PATH does not exist.
+    """
+    with open(path, encoding='utf-8') as config_file:
+        stat = os.fstat(config_file.fileno())
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = _CONFIG_CACHE.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        config = _parse_flatpak_config(config_file)
+
+    _CONFIG_CACHE[path] = (key, config)
+    return config
+
+@lru_cache(maxsize=None)
+def _user_flatpak_dir():
+    """
+    Return the current user's flatpak installation directory.
+
+    This is looked up on first use instead of at import time.
+    """
+    return os.path.join(pathlib.Path.home(), '.local/share/flatpak')
+
+class _UserFlatpakDir():
+    """
+    Resolves to the current user's flatpak installation directory when read
+    from either the class or an instance.
+    """
+
+    def __get__(self, obj, objtype=None):
+        return _user_flatpak_dir()
+
 class NoRemoteExistsError(Exception):
     pass
 
@@ -60,18 +142,52 @@ class Remotes():
         A remote object.
     """
 
-    fp_sys_config_filepath = '/var/lib/flatpak/'
-    fp_user_config_filepath = os.path.join(
-        pathlib.Path.home(),
-        '.local/share/flatpak'
-    )
     fp_config_filename = 'repo/config'
+    fp_sys_config_filepath = '/var/lib/flatpak/'
+    fp_user_config_filepath = _UserFlatpakDir()
 
     def __init__(self):
-        self.log = logging.getLogger('pyflatpak.Remotes')
+        self.log = log
         self.log.debug('Loaded!')
-        self.remotes = {}
-        self.get_remotes()
+        self._remotes = None
+
+    @property
+    def remotes(self):
+        """
+        The system and user remotes, keyed by 'system' and 'user'.
+
+        The remote configuration is read on first access rather than when the
+        object is created.
+        """
+        if self._remotes is None:
+            self.get_remotes()
+        return self._remotes
+
+    @remotes.setter
+    def remotes(self, remotes):
+        self._remotes = remotes
+
+    @property
+    def system_remotes(self):
+        """
+        The remotes configured system-wide, keyed by name.
+        """
+        return self.remotes['system']
+
+    @system_remotes.setter
+    def system_remotes(self, system_remotes):
+        self.remotes['system'] = system_remotes
+
+    @property
+    def user_remotes(self):
+        """
+        The remotes configured for the current user, keyed by name.
+        """
+        return self.remotes['user']
+
+    @user_remotes.setter
+    def user_remotes(self, user_remotes):
+        self.remotes['user'] = user_remotes
     
     def get_remote(self, loc='~/.local/share/flatpak', option='user'):
         """
@@ -79,54 +195,43 @@ class Remotes():
         """
 
         current_remotes = {}
-        config = ConfigParser()
         fp_config = os.path.join(loc, self.fp_config_filename)
         self.log.debug('Looking for %s remotes in %s', option, fp_config)
 
-        with open(fp_config) as config_file:
-            config.read_file(config_file)
+        config = _load_config(fp_config)
         
-        for section in config.sections():
-            if 'remote' in section:
-                remote_name = section.split('"')[1]
-                current_remotes[remote_name] = {}
+        for section, remote in config.items():
+            match = _REMOTE_SECTION_RE.fullmatch(section)
+            if match:
+                remote_name = match.group(1)
                 
-                try:
-                    remote_title = config[section]['xa.title']
-                except KeyError:
-                    remote_title = remote_name
+                remote_title = remote.get('xa.title', remote_name)
                 
-                # This complicated block tries to set the about field to the
-                # comment section first. If that's not present, it falls back 
-                # on the description field. If that too is not present, then
-                # we fall back on using the name field.
-                try:
-                    remote_about = config[section]['xa.comment']
-                except KeyError:
-                    try:
-                        remote_about = config[section]['xa.description']
-                    except KeyError:
-                        remote_about = remote_name
+                # Try to set the about field to the comment section first. If
+                # that's not present, fall back on the description field. If
+                # that too is not present, then fall back on the name field.
+                remote_about = remote.get(
+                    'xa.comment', remote.get('xa.description', remote_name)
+                )
                 
-                try:
-                    icon = config[section]['xa.icon']
-                except KeyError:
-                    icon = None
-
-                try:
-                    remote_homepage = config[section]['xa.homepage']
-                except KeyError:
-                    remote_homepage = None
-
-                remote_url = config[section]['url']
-
-                current_remotes[remote_name]['name'] = remote_name
-                current_remotes[remote_name]['title'] = remote_title
-                current_remotes[remote_name]['url'] = remote_url
-                current_remotes[remote_name]['option'] = option
-                current_remotes[remote_name]['about'] = remote_about
-                current_remotes[remote_name]['icon'] = icon
-                current_remotes[remote_name]['homepage'] = remote_homepage
+                icon = remote.get('xa.icon')
+                remote_homepage = remote.get('xa.homepage')
+
+                remote_url = remote.get('url')
+
+                disable = remote.get('xa.disable', 'false')
+                remote_enabled = disable.strip().lower() not in _TRUE_VALUES
+
+                current_remotes[remote_name] = {
+                    'name': remote_name,
+                    'title': remote_title,
+                    'url': remote_url,
+                    'option': option,
+                    'about': remote_about,
+                    'icon': icon,
+                    'homepage': remote_homepage,
+                    'enabled': remote_enabled,
+                }
         
         return (option, current_remotes)
     
@@ -135,22 +240,25 @@ class Remotes():
         Update system and user remotes
         """
         try:
-            self.system_remotes = self.get_remote(
+            system_remotes = self.get_remote(
                 loc=self.fp_sys_config_filepath, 
                 option='system'
             )[1]
         except FileNotFoundError:
-            self.system_remotes = {}
+            system_remotes = {}
         
         try:
-            self.user_remotes = self.get_remote(
+            user_remotes = self.get_remote(
                 loc=self.fp_user_config_filepath,
                 option='user'
             )[1]
         except FileNotFoundError:
-            self.user_remotes = {}
-        self.remotes['system'] = self.system_remotes
-        self.remotes['user'] = self.user_remotes
+            user_remotes = {}
+
+        if self._remotes is None:
+            self._remotes = {}
+        self._remotes['system'] = system_remotes
+        self._remotes['user'] = user_remotes
 
     
     def delete_remote(self, remote_name):
@@ -162,7 +270,7 @@ class Remotes():
         """
         self.get_remotes()
         if remote_name not in self.user_remotes and remote_name not in self.system_remotes:
-            self.log.exception('Remote %s not configured!' % remote_name)
+            self.log.exception('Remote %s not configured!', remote_name)
             raise NoRemoteExistsError
         
         rm_command = command.Command(['remote-delete', '--force', remote_name])